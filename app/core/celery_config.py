@@ -5,12 +5,14 @@ from app.core.redis_sonfig import get_redis_url
 
 def make_celery(app_name: str = "ticket_fast_api") -> Celery:
     redis_url = get_redis_url()
-    celery = Celery(app_name, broker=redis_url, backend=redis_url)
-    celery.conf.task_serializer = "json"
-    celery.conf.result_serializer = "json"
-    celery.conf.accept_content = ["json"]
-    celery.conf.result_persistent = False
-    celery.conf.task_track_started = True
+    # No result backend: tasks are fire-and-forget and nothing calls .get(),
+    # so result and STARTED-state settings would have nothing to write to
+    celery = Celery(app_name, broker=redis_url)
+    # Task payloads are small ints; msgpack is more compact and faster than JSON.
+    # JSON is still accepted so messages queued before the switch are consumed
+    celery.conf.task_serializer = "msgpack"
+    celery.conf.accept_content = ["msgpack", "json"]
+    celery.conf.task_ignore_result = True
     return celery
 
 
@@ -1,8 +1,30 @@
 import os
 
+import redis
+
 # Redis configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Fail fast on a hung Redis: the cache treats errors as misses, so a short
+# timeout keeps stats/report reads and booking commits off a stalled socket
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+
+# One pool per process; connections are opened lazily and reused
+_POOL = redis.ConnectionPool.from_url(
+    REDIS_URL,
+    max_connections=64,
+    health_check_interval=30,
+    socket_keepalive=True,
+    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    decode_responses=True,
+)
+_CLIENT = redis.Redis(connection_pool=_POOL)
 
 
 def get_redis_url():
     return REDIS_URL
+
+
+def get_redis_client() -> redis.Redis:
+    """Return the shared Redis client backed by the module connection pool."""
+    return _CLIENT
@@ -6,9 +6,23 @@ from sqlalchemy.orm import declarative_base, sessionmaker
 DATABASE_URL = "sqlite:///./ticket.db"  # Using SQLite for simplicity
 
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Size the pool for booking bursts instead of the 5 + 10 default; LIFO keeps
+# a warm subset of connections in use and pre-ping drops dead ones
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=20,
+    max_overflow=40,
+    pool_recycle=1800,
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+)
+
+# Sessions are request-scoped, so keep loaded attributes after commit instead
+# of re-SELECTing them when the response is serialized
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 Base = declarative_base()
 
@@ -1,13 +1,29 @@
+import os
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.database.db import Base, engine
 from app.routes import bookings, events, reports
 
-app = FastAPI()
+# Routes use a sync SQLAlchemy Session, so FastAPI runs them on AnyIO worker
+# threads (40 by default); raise the cap so threads aren't the bottleneck
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "100"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
-# Configure CORS
-origins = ["*"]
+# Configure CORS: credentials are allowed, so origins must be listed
+# explicitly (comma-separated in CORS_ORIGINS) rather than "*"
+origins = [o.strip() for o in os.getenv("CORS_ORIGINS", "").split(",") if o.strip()]
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,8 +33,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create all tables (in production, use migrations such as Alembic)
-Base.metadata.create_all(bind=engine)
+# Create all tables only when asked (RUN_DDL=1, e.g. local dev); otherwise
+# every worker start would issue the DDL checks. In production, use migrations
+if os.getenv("RUN_DDL") == "1":
+    Base.metadata.create_all(bind=engine)
 
 # Include the routers
 app.include_router(events.router)
@@ -1,7 +1,15 @@
 import enum
 from asyncio import Event
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database.db import Base
@@ -14,6 +22,14 @@ class BookingStatus(str, enum.Enum):
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Covers the finalized-count lookups in stats and reports
+        Index("ix_bookings_event_status", "event_id", "status"),
+        # One booking per user per event; makes retried bookings idempotent
+        UniqueConstraint("event_id", "user_id", name="uq_booking_event_user"),
+    )
+    # Fetch server defaults (created_at) via RETURNING on INSERT
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id"), nullable=False)
@@ -13,4 +13,7 @@ class Event(Base):
     capacity: Mapped[int] = mapped_column(Integer, nullable=False)
     booked_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
-    bookings: Mapped[list["Booking"]] = relationship(back_populates="event")
+    # Never lazy-load: callers must opt in with selectinload(Event.bookings)
+    bookings: Mapped[list["Booking"]] = relationship(
+        back_populates="event", lazy="raise_on_sql"
+    )
@@ -1,10 +1,12 @@
+import contextlib
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.database.db import get_db
 from app.schemas.books import BookingOut, BookRequest
 from app.services.bookings import SoldOutError, create_booking
-from app.tasks import finalize_booking_task
+from app.tasks import FINALIZE_DELAY_SECONDS, finalize_booking_task
 
 router = APIRouter(prefix="/book", tags=["bookings"])
 
@@ -17,12 +19,9 @@ def book_ticket(payload: BookRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=409, detail=str(e))
 
     # enqueue durable background work to finalize the booking
-    import contextlib
     with contextlib.suppress(Exception):
-        delay_fn = getattr(finalize_booking_task, "delay", None)
-        if callable(delay_fn):
-            delay_fn(booking.id)
-        else:
-            finalize_booking_task(booking.id) # type: ignore
+        finalize_booking_task.apply_async(
+            args=[booking.id], countdown=FINALIZE_DELAY_SECONDS
+        )
 
     return booking
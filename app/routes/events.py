@@ -5,6 +5,7 @@ from app.database.db import get_db
 from app.models.events import Event
 from app.schemas.events import EventCreate, EventOut, EventStatsOut
 from app.services.bookings import get_event_stats
+from app.services.cache import mark_stats_stale
 
 router = APIRouter(prefix="/event", tags=["events"])
 
@@ -13,8 +14,9 @@ router = APIRouter(prefix="/event", tags=["events"])
 def create_event(payload: EventCreate, db: Session = Depends(get_db)):
     event = Event(title=payload.title, capacity=payload.capacity, booked_count=0)
     db.add(event)
+    mark_stats_stale(db)
+    # The INSERT populates the id; every other field is already known
     db.commit()
-    db.refresh(event)
     return event
 
 
@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ---------- Event ----------
@@ -14,8 +14,7 @@ class EventOut(BaseModel):
     capacity: int
     booked_count: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class EventStatsOut(BaseModel):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class ReportOut(BaseModel):
@@ -6,5 +6,4 @@ class ReportOut(BaseModel):
     total_reserved: int
     total_finalized: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,54 +1,84 @@
 
-import redis
-from sqlalchemy import func, select, update
+from sqlalchemy import delete, func, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from app.core.redis_sonfig import get_redis_url
+from app.database.db import engine
 from app.models.books import Booking, BookingStatus
 from app.models.events import Event
+from app.services.cache import (
+    REPORT_CACHE_KEY,
+    cached,
+    event_stats_key,
+    mark_stats_stale,
+)
+
+_PENDING = BookingStatus.PENDING.value
+_FINALIZED = BookingStatus.FINALIZED.value
+
+# INSERT constructs supporting ON CONFLICT DO NOTHING, by dialect name;
+# picked once for the configured database
+_INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+try:
+    _insert = _INSERT_BY_DIALECT[engine.dialect.name]
+except KeyError:
+    _url = engine.url.render_as_string(hide_password=True)
+    raise RuntimeError(
+        f"Unsupported DATABASE_URL {_url!r}: "
+        f"bookings need one of {', '.join(sorted(_INSERT_BY_DIALECT))}"
+    ) from None
 
 
 class SoldOutError(Exception):
     pass
 
 
-def get_redis_client():
-    """Get Redis client for locking."""
-    return redis.from_url(get_redis_url(), decode_responses=True)
-
-
 def create_booking(db: Session, *, event_id: int, user_id: int) -> Booking:
     """
-    Create a booking with Redis Lock to prevent race conditions.
-    This ensures only one request can book the last ticket.
+    Create a booking guarded by an atomic conditional UPDATE.
+    The capacity check and increment happen in one statement, so the
+    database row lock is the only serialization point and overselling
+    is impossible even without an external lock.
+    Booking again for the same (event_id, user_id) returns the existing
+    booking without consuming another seat, even once the event is full.
     """
-    redis_client = get_redis_client()
-    lock_key = f"event_lock:{event_id}"
-    lock = redis_client.lock(lock_key, timeout=10, blocking_timeout=5)
-
-    try:
-        # Acquire the lock - only one process can proceed at a time
-        if not lock.acquire(blocking=True, blocking_timeout=5):
-            raise SoldOutError("Could not acquire lock, please try again.")
-
-        try:
-            # Check if we're already in a transaction (for tests)
-            if db.in_transaction():
-                # Use the existing transaction
-                return _create_booking_in_transaction(db, event_id, user_id)
-            else:
-                # Start a new transaction
-                with db.begin():
-                    return _create_booking_in_transaction(db, event_id, user_id)
-        finally:
-            # Always release the lock
-            lock.release()
-    except redis.exceptions.LockError: # type: ignore
-        raise SoldOutError("Could not acquire lock, please try again.")
+    # Check if we're already in a transaction (for tests)
+    if db.in_transaction():
+        # Use the existing transaction
+        return _create_booking_in_transaction(db, event_id, user_id)
+    # Start a new transaction
+    with db.begin():
+        return _create_booking_in_transaction(db, event_id, user_id)
 
 
 def _create_booking_in_transaction(db: Session, event_id: int, user_id: int) -> Booking:
     """Internal function to create booking within a transaction."""
+    # Insert first so a retry is recognised before capacity is checked.
+    # Selecting from events inserts nothing for an unknown event instead of
+    # tripping the foreign key.
+    stmt = (
+        _insert(Booking)
+        .from_select(
+            ["event_id", "user_id", "status"],
+            select(Event.id, literal(user_id), literal(_PENDING)).where(
+                Event.id == event_id
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["event_id", "user_id"])
+        .returning(Booking)
+    )
+    booking = db.scalars(stmt).one_or_none()
+    if booking is None:
+        # Retried booking: return the original without touching booked_count
+        existing = db.scalars(
+            select(Booking).where(
+                Booking.event_id == event_id, Booking.user_id == user_id
+            )
+        ).one_or_none()
+        if existing is None:
+            raise SoldOutError("Event is sold out.")
+        return existing
+
     # Check capacity and increment booked_count atomically
     stmt = (
         update(Event)
@@ -58,16 +88,12 @@ def _create_booking_in_transaction(db: Session, event_id: int, user_id: int) ->
     )
     res = db.execute(stmt)
     if res.rowcount != 1:  # type: ignore
+        # Remove the booking inserted above ourselves: a caller-owned
+        # transaction carries on after SoldOutError instead of rolling back
+        db.execute(delete(Booking).where(Booking.id == booking.id))
         raise SoldOutError("Event is sold out.")
 
-    booking = Booking(
-        event_id=event_id,
-        user_id=user_id,
-        status=BookingStatus.PENDING.value,
-    )
-    db.add(booking)
-    db.flush()  # gets booking.id
-    db.refresh(booking)
+    mark_stats_stale(db, event_id)
     return booking
 
 
@@ -84,43 +110,65 @@ def finalize_booking(db: Session, booking_id: int) -> None:
 
 def _finalize_booking_in_transaction(db: Session, booking_id: int) -> None:
     """Internal function to finalize booking within a transaction."""
-    booking = db.get(Booking, booking_id)
-    if not booking:
-        return
-    booking.status = BookingStatus.FINALIZED.value
+    # Single conditional UPDATE; missing or already finalized bookings are a no-op
+    stmt = (
+        update(Booking)
+        .where(Booking.id == booking_id)
+        .where(Booking.status == _PENDING)
+        .values(status=_FINALIZED)
+        .returning(Booking.event_id)
+    )
+    event_id = db.execute(stmt).scalar_one_or_none()
+    if event_id is not None:
+        mark_stats_stale(db, event_id)
 
 
+@cached(event_stats_key)
 def get_event_stats(db: Session, event_id: int) -> dict:
-    event = db.get(Event, event_id)
-    if not event:
-        return {}
-
-    finalized_count = db.scalar(
-        select(func.count(Booking.id)).where(
+    """Return capacity and booking counts for one event in a single round-trip."""
+    finalized_count = (
+        select(func.count(Booking.id))
+        .where(
             Booking.event_id == event_id,
-            Booking.status == BookingStatus.FINALIZED.value,
+            Booking.status == _FINALIZED,
         )
+        .scalar_subquery()
+        .label("finalized_count")
     )
+    stmt = select(Event.id, Event.capacity, Event.booked_count, finalized_count).where(
+        Event.id == event_id
+    )
+    row = db.execute(stmt).one_or_none()
+    if row is None:
+        return {}
 
     return {
-        "event_id": event.id,
-        "capacity": event.capacity,
-        "booked_count": event.booked_count,
-        "finalized_count": int(finalized_count or 0),
+        "event_id": row.id,
+        "capacity": row.capacity,
+        "booked_count": row.booked_count,
+        "finalized_count": int(row.finalized_count),
     }
 
 
+@cached(lambda: REPORT_CACHE_KEY)
 def get_overall_report(db: Session) -> dict:
-    """Return aggregated totals across all events."""
-    total_capacity = db.scalar(select(func.sum(Event.capacity)))
-    total_reserved = db.scalar(select(func.sum(Event.booked_count)))
-
-    total_finalized = db.scalar(
-        select(func.count(Booking.id)).where(Booking.status == BookingStatus.FINALIZED.value)
+    """Return aggregated totals across all events in a single round-trip."""
+    stmt = select(
+        select(func.coalesce(func.sum(Event.capacity), 0))
+        .scalar_subquery()
+        .label("total_capacity"),
+        select(func.coalesce(func.sum(Event.booked_count), 0))
+        .scalar_subquery()
+        .label("total_reserved"),
+        select(func.count(Booking.id))
+        .where(Booking.status == _FINALIZED)
+        .scalar_subquery()
+        .label("total_finalized"),
     )
+    row = db.execute(stmt).one()
 
     return {
-        "total_capacity": int(total_capacity or 0),
-        "total_reserved": int(total_reserved or 0),
-        "total_finalized": int(total_finalized or 0),
+        "total_capacity": int(row.total_capacity),
+        "total_reserved": int(row.total_reserved),
+        "total_finalized": int(row.total_finalized),
     }
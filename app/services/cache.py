@@ -0,0 +1,73 @@
+import contextlib
+import functools
+import inspect
+import json
+from collections.abc import Callable
+
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.redis_sonfig import get_redis_client
+
+REPORT_CACHE_KEY = "report:overall"
+STATS_CACHE_TTL = 30  # seconds
+
+_STALE_KEYS = "stale_cache_keys"
+
+
+def event_stats_key(event_id: int) -> str:
+    return f"stats:event:{event_id}"
+
+
+def cached(key_fn: Callable[..., str]):
+    """
+    Read-through Redis cache for service functions taking (db, ...).
+    key_fn receives the remaining arguments (positional or keyword) in
+    signature order. Empty results are not cached, and Redis errors fall
+    back to the database.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(db: Session, *args, **kwargs):
+            bound = signature.bind(db, *args, **kwargs)
+            bound.apply_defaults()
+            key = key_fn(*list(bound.arguments.values())[1:])
+            client = get_redis_client()
+            with contextlib.suppress(redis.RedisError):
+                hit = client.get(key)
+                if hit is not None:
+                    return json.loads(hit)
+
+            result = fn(*bound.args, **bound.kwargs)
+            if result:
+                with contextlib.suppress(redis.RedisError):
+                    client.set(key, json.dumps(result), ex=STATS_CACHE_TTL)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def mark_stats_stale(db: Session, event_id: int | None = None) -> None:
+    """Drop the cached report (and event stats) once db's transaction commits."""
+    keys = db.info.setdefault(_STALE_KEYS, set())
+    keys.add(REPORT_CACHE_KEY)
+    if event_id is not None:
+        keys.add(event_stats_key(event_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _delete_stale_keys(session: Session) -> None:
+    keys = session.info.pop(_STALE_KEYS, None)
+    if keys:
+        with contextlib.suppress(redis.RedisError):
+            get_redis_client().delete(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_keys(session: Session) -> None:
+    session.info.pop(_STALE_KEYS, None)
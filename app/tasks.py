@@ -1,18 +1,43 @@
-import time
+from collections.abc import Iterable
+
+from celery.signals import task_postrun, worker_process_init
+from sqlalchemy.orm import scoped_session
 
 from app.core.celery_config import celery_app
-from app.database.db import SessionLocal
+from app.database.db import SessionLocal, engine
 from app.services.bookings import finalize_booking
 
+# Simulated ticket issuance time (PDF generation/email), applied by the
+# broker as a countdown so no worker sits idle while waiting
+FINALIZE_DELAY_SECONDS = 5
+
+
+# Per-thread session reused across tasks in a worker; task_postrun removes it
+# so its connection goes back to the pool between tasks
+WorkerSession = scoped_session(SessionLocal)
+
+
+@worker_process_init.connect
+def _init_worker_process(**_):
+    # Prefork children must not reuse pooled connections from the parent
+    engine.dispose(close=False)
 
-@celery_app.task(bind=True)
+
+@task_postrun.connect
+def _remove_worker_session(**_):
+    WorkerSession.remove()
+
+
+@celery_app.task(bind=True, ignore_result=True)
 def finalize_booking_task(self, booking_id: int):
-    """Finalize booking after 5 second delay (simulates PDF generation/email)."""
-    # Simulate time-consuming ticket issuance process
-    time.sleep(5)
-
-    db = SessionLocal()
-    try:
-        finalize_booking(db, booking_id)
-    finally:
-        db.close()
+    """Finalize booking (scheduled FINALIZE_DELAY_SECONDS after booking)."""
+    finalize_booking(WorkerSession(), booking_id)
+
+
+def bulk_finalize(booking_ids: Iterable[int], countdown: int = FINALIZE_DELAY_SECONDS) -> None:
+    """Enqueue finalization for many bookings over a single broker connection."""
+    with celery_app.producer_or_acquire() as producer:
+        for booking_id in booking_ids:
+            finalize_booking_task.apply_async(
+                args=[booking_id], countdown=countdown, producer=producer
+            )
@@ -2,48 +2,122 @@
 Test configuration and fixtures for the ticket booking system.
 """
 import os
-from typing import Generator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import AsyncGenerator, Callable, Generator
 
 import fakeredis
+import httpx
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func, select
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.celery_config import celery_app as _celery_app
 from app.database.db import Base, get_db
 from app.main import app
+from app.models.books import Booking, BookingStatus
+from app.models.events import Event
 
-# Use in-memory SQLite for tests
-TEST_DATABASE_URL = "sqlite:///./test_ticket.db"
+# File-backed SQLite so concurrent tests get real, separate connections.
+# Do not switch this to an in-memory database with poolclass=StaticPool:
+# every thread would then share one connection, so the race tests' concurrent
+# transactions interleave on it (one thread's BEGIN/COMMIT ends another's) and
+# the overselling assertions fail or pass by accident. With a file, each
+# thread's session checks out its own pooled connection and SQLite's locking
+# serializes the writers as a real database would.
+# Under pytest-xdist each worker process gets its own database file
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
+TEST_DATABASE_URL = (
+    f"sqlite:///./test_ticket_{XDIST_WORKER}.db" if XDIST_WORKER else "sqlite:///./test_ticket.db"
+)
 
 engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-@pytest.fixture(scope="function")
-def db_session() -> Generator[Session, None, None]:
-    """Create a fresh database session for each test."""
-    # Create all tables
+@event.listens_for(engine, "connect")
+def _fast_sqlite_pragmas(dbapi_connection, connection_record):
+    # Throwaway test data: keep the journal in memory and skip fsync
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.close()
+
+
+# expire_on_commit=False: tests keep using objects after commit without a
+# reload; values changed by other statements are re-read with explicit SELECTs
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+
+def finalized_count(db: Session, event_id: int) -> int:
+    """Count an event's finalized bookings with a single COUNT query."""
+    stmt = (
+        select(func.count())
+        .select_from(Booking)
+        .where(Booking.event_id == event_id, Booking.status == BookingStatus.FINALIZED.value)
+    )
+    return db.execute(stmt).scalar_one()
+
+
+@pytest.fixture(scope="session")
+def _schema() -> Generator[None, None, None]:
+    """Create the tables once for the whole test session."""
     Base.metadata.create_all(bind=engine)
-    
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(_schema) -> Generator[Session, None, None]:
+    """
+    Create a fresh database session for each test.
+    Rows are deleted afterwards rather than rolled back, since task and
+    concurrency tests commit through their own sessions.
+    """
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        # Empty the tables instead of dropping them (no DDL per test)
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture(scope="function")
+def make_event(db_session: Session) -> Callable[..., Event]:
+    """
+    Factory inserting an Event (omitted columns get test defaults).
+    The row is committed, not just flushed: services, tasks and API
+    requests under test read it through their own sessions.
+    """
+    def _make_event(**kwargs) -> Event:
+        event = Event(**{"title": "Test Event", "capacity": 10, "booked_count": 0, **kwargs})
+        db_session.add(event)
+        db_session.commit()
+        return event
+
+    return _make_event
+
+
+def override_get_db() -> Generator[Session, None, None]:
+    """
+    Give each request its own session, as in production, so concurrent
+    requests never share one Session across threads.
+    """
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
-        # Drop all tables after test
-        Base.metadata.drop_all(bind=engine)
 
 
 @pytest.fixture(scope="function")
 def client(db_session: Session) -> TestClient:
     """Create a test client with database dependency override."""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
-    
     app.dependency_overrides[get_db] = override_get_db
     
     with TestClient(app) as test_client:
@@ -52,11 +126,72 @@ def client(db_session: Session) -> TestClient:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    """Run @pytest.mark.anyio tests on asyncio only."""
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def async_client(db_session: Session) -> AsyncGenerator[httpx.AsyncClient, None]:
+    """
+    Async test client for fanning out many requests from one event loop
+    (asyncio.gather) instead of one client thread per request.
+    """
+    app.dependency_overrides[get_db] = override_get_db
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="session")
+def thread_pool() -> Generator[ThreadPoolExecutor, None, None]:
+    """
+    One worker pool for the threaded concurrency tests, reused across tests.
+    Sized for the largest fan-out (10 requests) rather than the core count:
+    the workers block in SQLite, so every request must be in flight at once
+    for the race tests to exercise the atomic capacity UPDATE.
+    """
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        yield executor
+
+
+@pytest.fixture(scope="session")
+def celery_app():
+    """The configured Celery app (tasks are registered via app.main's imports)."""
+    return _celery_app
+
+
+@contextmanager
+def swap_worker_session(factory: Callable[[], Session]) -> Generator[None, None, None]:
+    """
+    Point app.tasks.WorkerSession at factory for the duration of the block.
+    A plain attribute swap; cheaper than mock.patch and needs no MagicMock.
+    """
+    import app.tasks as tasks
+
+    old = tasks.WorkerSession
+    tasks.WorkerSession = factory
+    try:
+        yield
+    finally:
+        tasks.WorkerSession = old
+
+
+@pytest.fixture(scope="session")
+def _fake_redis_server() -> fakeredis.FakeServer:
+    """One fake Redis server for the whole test session."""
+    return fakeredis.FakeServer()
+
+
 @pytest.fixture(scope="function")
-def fake_redis():
-    """Create a fake Redis client with lock support."""
+def fake_redis(_fake_redis_server):
+    """Create a fake Redis client with lock support (flushed after each test)."""
     from unittest.mock import Mock
-    redis = fakeredis.FakeRedis(decode_responses=True)
+    redis = fakeredis.FakeRedis(server=_fake_redis_server, decode_responses=True)
     
     # Track active locks for testing blocking behavior
     active_locks = set()
@@ -94,21 +229,30 @@ def fake_redis():
         return mock_lock_obj
     
     redis.lock = mock_lock
-    return redis
+    yield redis
+    redis.flushdb()
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="function", autouse=True)
 def redis_client(fake_redis, monkeypatch):
-    """Mock the Redis client used in the application."""
-    def mock_get_redis_client():
-        return fake_redis
-    
-    # Mock the get_redis_client function
-    import app.services.bookings
-    monkeypatch.setattr(app.services.bookings, "get_redis_client", mock_get_redis_client)
-    
+    """Mock the shared Redis client used in the application (for every test)."""
+    import app.core.redis_sonfig
+    monkeypatch.setattr(app.core.redis_sonfig, "_CLIENT", fake_redis)
+
     return fake_redis
 
 
+@pytest.fixture(scope="function", autouse=True)
+def _no_broker_publish(monkeypatch):
+    """
+    Keep booking requests from waiting on the (unreachable) Celery broker.
+    Tests that assert on scheduling patch apply_async themselves.
+    """
+    from unittest.mock import Mock
+
+    from app.tasks import finalize_booking_task
+    monkeypatch.setattr(finalize_booking_task, "apply_async", Mock())
+
+
 # Set test environment
 os.environ["REDIS_URL"] = "redis://fake:6379/0"
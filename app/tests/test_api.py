@@ -1,12 +1,19 @@
 """
 Test API endpoints.
 """
+from unittest.mock import patch
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.books import Booking, BookingStatus
 from app.models.events import Event
+from app.tasks import FINALIZE_DELAY_SECONDS, finalize_booking_task
+
+PENDING = BookingStatus.PENDING.value
+FINALIZED = BookingStatus.FINALIZED.value
 
 
 class TestEventEndpoints:
@@ -41,16 +48,15 @@ class TestEventEndpoints:
         event = Event(title="Stats Test", capacity=50, booked_count=20)
         db_session.add(event)
         db_session.commit()
-        db_session.refresh(event)
 
         # Create some finalized bookings
-        for i in range(10):
-            booking = Booking(
-                event_id=event.id,
-                user_id=i + 1,
-                status=BookingStatus.FINALIZED.value
-            )
-            db_session.add(booking)
+        db_session.execute(
+            insert(Booking),
+            [
+                {"event_id": event.id, "user_id": i + 1, "status": FINALIZED}
+                for i in range(10)
+            ],
+        )
         db_session.commit()
 
         response = client.get(f"/event/{event.id}/stats")
@@ -77,7 +83,6 @@ class TestBookingEndpoints:
         event = Event(title="Bookable Event", capacity=10, booked_count=0)
         db_session.add(event)
         db_session.commit()
-        db_session.refresh(event)
 
         response = client.post(
             "/book",
@@ -88,9 +93,26 @@ class TestBookingEndpoints:
         data = response.json()
         assert data["event_id"] == event.id
         assert data["user_id"] == 42
-        assert data["status"] == BookingStatus.PENDING.value
+        assert data["status"] == PENDING
         assert "id" in data
 
+    def test_book_ticket_schedules_finalization(self, client: TestClient, db_session: Session, redis_client):
+        """Test that booking schedules finalization with a countdown."""
+        event = Event(title="Scheduled Event", capacity=10, booked_count=0)
+        db_session.add(event)
+        db_session.commit()
+
+        with patch.object(finalize_booking_task, "apply_async") as apply_async:
+            response = client.post(
+                "/book",
+                json={"event_id": event.id, "user_id": 7}
+            )
+
+        assert response.status_code == 200
+        apply_async.assert_called_once_with(
+            args=[response.json()["id"]], countdown=FINALIZE_DELAY_SECONDS
+        )
+
     def test_book_ticket_sold_out(self, client: TestClient, db_session: Session, redis_client):
         """Test booking when event is sold out."""
         event = Event(title="Full Event", capacity=1, booked_count=1)
@@ -152,15 +174,14 @@ class TestReportEndpoints:
         db_session.commit()
 
         # Create some finalized bookings
-        for event in [event1, event2]:
-            db_session.refresh(event)
-            for i in range(5):
-                booking = Booking(
-                    event_id=event.id,
-                    user_id=i + 100,
-                    status=BookingStatus.FINALIZED.value
-                )
-                db_session.add(booking)
+        db_session.execute(
+            insert(Booking),
+            [
+                {"event_id": event.id, "user_id": i + 100, "status": FINALIZED}
+                for event in [event1, event2]
+                for i in range(5)
+            ],
+        )
         db_session.commit()
 
         response = client.get("/report")
@@ -184,16 +205,15 @@ class TestReportEndpoints:
         event = Event(title="Report Event", capacity=75, booked_count=40)
         db_session.add(event)
         db_session.commit()
-        db_session.refresh(event)
 
         # Add finalized bookings
-        for i in range(15):
-            booking = Booking(
-                event_id=event.id,
-                user_id=i + 500,
-                status=BookingStatus.FINALIZED.value
-            )
-            db_session.add(booking)
+        db_session.execute(
+            insert(Booking),
+            [
+                {"event_id": event.id, "user_id": i + 500, "status": FINALIZED}
+                for i in range(15)
+            ],
+        )
         db_session.commit()
 
         response = client.get(f"/report/event/{event.id}")
@@ -245,10 +265,10 @@ class TestAPIIntegration:
         report = response.json()
         assert report["total_reserved"] == 3
 
-    def test_concurrent_api_bookings(self, client: TestClient, db_session: Session, redis_client):
+    def test_concurrent_api_bookings(
+        self, client: TestClient, db_session: Session, redis_client, thread_pool
+    ):
         """Test concurrent API requests don't cause race conditions."""
-        from concurrent.futures import ThreadPoolExecutor
-
         # Create event
         event = Event(title="Concurrent Event", capacity=3, booked_count=0)
         db_session.add(event)
@@ -265,9 +285,8 @@ class TestAPIIntegration:
             return response.status_code
 
         # Try to book 10 tickets for event with capacity 3
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(book_via_api, i) for i in range(1, 11)]
-            results = [f.result() for f in futures]
+        futures = [thread_pool.submit(book_via_api, i) for i in range(1, 11)]
+        results = [f.result() for f in futures]
 
         # Count successful bookings (status 200)
         successful = [r for r in results if r == 200]
@@ -5,17 +5,39 @@ import time
 from unittest.mock import Mock, patch
 
 import pytest
-from sqlalchemy.orm import Session
+from celery.signals import task_postrun
+from sqlalchemy import select
+from sqlalchemy.orm import Session, scoped_session
 
 from app.models.books import Booking, BookingStatus
 from app.models.events import Event
-from app.tasks import finalize_booking_task
-from app.tests.conftest import TestingSessionLocal
+from app.tasks import (
+    FINALIZE_DELAY_SECONDS,
+    WorkerSession,
+    bulk_finalize,
+    finalize_booking_task,
+)
+from app.tests.conftest import TestingSessionLocal, finalized_count, swap_worker_session
+
+PENDING = BookingStatus.PENDING.value
+FINALIZED = BookingStatus.FINALIZED.value
 
 
 class TestCeleryTasks:
     """Test Celery task functionality."""
 
+    @pytest.fixture(autouse=True)
+    def _worker_session(self):
+        """
+        Run task bodies against the test database. Sessions are created only
+        when a task asks for one, and closed afterwards (task_postrun does
+        this in a real worker, but .run() bypasses the signals).
+        """
+        sessions = scoped_session(TestingSessionLocal)
+        with swap_worker_session(sessions):
+            yield
+        sessions.remove()
+
     def test_finalize_booking_task_updates_status(self, db_session: Session):
         """Test that finalize_booking_task updates booking status."""
         # Create event and booking
@@ -26,31 +48,27 @@ class TestCeleryTasks:
         booking = Booking(
             event_id=event.id,
             user_id=1,
-            status=BookingStatus.PENDING.value
+            status=PENDING
         )
         db_session.add(booking)
         db_session.commit()
-        db_session.refresh(booking)
 
         booking_id = booking.id
 
-        # Mock SessionLocal to return a fresh session from the test sessionmaker
-        with patch('app.tasks.SessionLocal', return_value=TestingSessionLocal()):
-            # Call the task function directly (not through Celery)
-            finalize_booking_task.run(booking_id)  # Use .run() method
+        # Call the task function directly (not through Celery)
+        finalize_booking_task.run(booking_id)  # Use .run() method
 
-        # The finalize_booking function commits, so we need to refresh from DB
-        db_session.refresh(booking)
-        assert booking.status == BookingStatus.FINALIZED.value
+        # The task commits through its own session, so read the status back
+        status = db_session.scalar(select(Booking.status).where(Booking.id == booking_id))
+        assert status == FINALIZED
 
     def test_finalize_booking_task_with_nonexistent_booking(self, db_session: Session):
         """Test that finalize_booking_task handles nonexistent bookings gracefully."""
-        with patch('app.tasks.SessionLocal', return_value=TestingSessionLocal()):
-            # Should not raise an exception
-            finalize_booking_task.run(99999)
+        # Should not raise an exception
+        finalize_booking_task.run(99999)
 
     def test_finalize_booking_task_delay_simulation(self, db_session: Session):
-        """Test that the task simulates a time delay."""
+        """Test that the task body does not block for the issuance delay."""
         event = Event(title="Delayed Event", capacity=5, booked_count=1)
         db_session.add(event)
         db_session.commit()
@@ -58,7 +76,7 @@ class TestCeleryTasks:
         booking = Booking(
             event_id=event.id,
             user_id=2,
-            status=BookingStatus.PENDING.value
+            status=PENDING
         )
         db_session.add(booking)
         db_session.commit()
@@ -68,35 +86,38 @@ class TestCeleryTasks:
         # Measure time taken
         start_time = time.time()
 
-        with patch('app.tasks.SessionLocal', return_value=TestingSessionLocal()):
-            finalize_booking_task.run(booking_id)
+        finalize_booking_task.run(booking_id)
         
         elapsed_time = time.time() - start_time
         
-        # Should take at least 5 seconds (simulated processing time)
-        assert elapsed_time >= 5.0
+        # The delay is applied as a Celery countdown, not slept in the worker
+        assert elapsed_time < FINALIZE_DELAY_SECONDS
         
         # Verify booking was finalized
-        db_session.refresh(booking)
-        assert booking.status == BookingStatus.FINALIZED.value
+        status = db_session.scalar(select(Booking.status).where(Booking.id == booking_id))
+        assert status == FINALIZED
 
-    def test_celery_app_configuration(self):
+    def test_celery_app_configuration(self, celery_app):
         """Test that Celery app is properly configured."""
-        from app.core.celery_config import celery_app
-        
-        assert celery_app.conf.task_serializer == "json"
-        assert celery_app.conf.result_serializer == "json"
-        assert "json" in celery_app.conf.accept_content
-        assert celery_app.conf.task_track_started is True
+        assert celery_app.conf.task_serializer == "msgpack"
+        assert "msgpack" in celery_app.conf.accept_content
+        assert celery_app.conf.task_ignore_result is True
+        assert finalize_booking_task.ignore_result is True
 
-    def test_finalize_booking_task_is_registered(self):
+    def test_finalize_booking_task_is_registered(self, celery_app):
         """Test that the finalize_booking task is registered with Celery."""
-        from app.core.celery_config import celery_app
-        
         # Check if task is registered
         task_name = "app.tasks.finalize_booking_task"
         assert task_name in celery_app.tasks or "finalize_booking_task" in str(celery_app.tasks)
 
+    def test_worker_session_removed_after_task(self):
+        """Test that the worker session is released when a task finishes."""
+        with swap_worker_session(WorkerSession), \
+                patch.object(WorkerSession, "remove") as remove:
+            task_postrun.send(sender=finalize_booking_task)
+
+        remove.assert_called_once_with()
+
     def test_multiple_bookings_finalization(self, db_session: Session):
         """Test finalizing multiple bookings."""
         event = Event(title="Multi Booking Event", capacity=10, booked_count=3)
@@ -108,7 +129,7 @@ class TestCeleryTasks:
             booking = Booking(
                 event_id=event.id,
                 user_id=i + 1,
-                status=BookingStatus.PENDING.value
+                status=PENDING
             )
             db_session.add(booking)
             bookings.append(booking)
@@ -116,12 +137,25 @@ class TestCeleryTasks:
         db_session.commit()
         
         # Finalize all bookings
-        with patch('app.tasks.SessionLocal', return_value=TestingSessionLocal()):
-            for booking in bookings:
-                db_session.refresh(booking)
-                finalize_booking_task.run(booking.id)
+        for booking in bookings:
+            finalize_booking_task.run(booking.id)
         
         # Verify all are finalized
-        for booking in bookings:
-            db_session.refresh(booking)
-            assert booking.status == BookingStatus.FINALIZED.value
+        assert finalized_count(db_session, event.id) == 3
+
+    def test_bulk_finalize_shares_one_producer(self, celery_app):
+        """Test that bulk_finalize enqueues every booking through one producer."""
+        producer = Mock()
+        with patch.object(celery_app, "producer_or_acquire") as acquire, \
+                patch.object(finalize_booking_task, "apply_async") as apply_async:
+            acquire.return_value.__enter__.return_value = producer
+            bulk_finalize([1, 2, 3])
+
+        acquire.assert_called_once_with()
+        assert apply_async.call_count == 3
+        for call, booking_id in zip(apply_async.call_args_list, [1, 2, 3]):
+            assert call.kwargs == {
+                "args": [booking_id],
+                "countdown": FINALIZE_DELAY_SECONDS,
+                "producer": producer,
+            }
@@ -2,11 +2,16 @@
 Test database models (Event and Booking).
 """
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.books import Booking, BookingStatus
 from app.models.events import Event
 
+PENDING = BookingStatus.PENDING.value
+FINALIZED = BookingStatus.FINALIZED.value
+
 
 class TestEventModel:
     """Test the Event model."""
@@ -23,30 +28,27 @@ class TestEventModel:
         assert event.capacity == 100
         assert event.booked_count == 0
 
-    def test_event_relationship_with_bookings(self, db_session: Session):
+    def test_event_relationship_with_bookings(self, db_session: Session, make_event):
         """Test the relationship between Event and Booking."""
-        event = Event(title="Concert", capacity=50, booked_count=0)
-        db_session.add(event)
-        db_session.commit()
-        db_session.refresh(event)
+        event = make_event(title="Concert", capacity=50)
 
-        booking1 = Booking(event_id=event.id, user_id=1, status=BookingStatus.PENDING.value)
-        booking2 = Booking(event_id=event.id, user_id=2, status=BookingStatus.PENDING.value)
+        booking1 = Booking(event_id=event.id, user_id=1, status=PENDING)
+        booking2 = Booking(event_id=event.id, user_id=2, status=PENDING)
         db_session.add(booking1)
         db_session.add(booking2)
         db_session.commit()
 
-        # Refresh to load relationships
-        db_session.refresh(event)
-        
+        # Relationships must be loaded explicitly
+        event = db_session.execute(
+            select(Event).options(selectinload(Event.bookings)).where(Event.id == event.id)
+        ).scalar_one()
+
         assert len(event.bookings) == 2
         assert all(b.event_id == event.id for b in event.bookings)
 
-    def test_update_booked_count(self, db_session: Session):
+    def test_update_booked_count(self, db_session: Session, make_event):
         """Test updating booked_count."""
-        event = Event(title="Workshop", capacity=10, booked_count=0)
-        db_session.add(event)
-        db_session.commit()
+        event = make_event(title="Workshop", capacity=10)
 
         event.booked_count = 5
         db_session.commit()
@@ -54,21 +56,26 @@ class TestEventModel:
 
         assert event.booked_count == 5
 
+    def test_event_bookings_lazy_load_is_forbidden(self, db_session: Session, make_event):
+        """Test that Event.bookings cannot be lazy-loaded (N+1 guard)."""
+        event = make_event(title="Guarded", capacity=5)
+
+        event = db_session.get(Event, event.id)
+        with pytest.raises(InvalidRequestError):
+            _ = event.bookings
+
 
 class TestBookingModel:
     """Test the Booking model."""
 
-    def test_create_booking(self, db_session: Session):
+    def test_create_booking(self, db_session: Session, make_event):
         """Test creating a booking."""
-        event = Event(title="Festival", capacity=200, booked_count=0)
-        db_session.add(event)
-        db_session.commit()
-        db_session.refresh(event)
+        event = make_event(title="Festival", capacity=200)
 
         booking = Booking(
             event_id=event.id,
             user_id=42,
-            status=BookingStatus.PENDING.value
+            status=PENDING
         )
         db_session.add(booking)
         db_session.commit()
@@ -77,40 +84,36 @@ class TestBookingModel:
         assert booking.id is not None
         assert booking.event_id == event.id
         assert booking.user_id == 42
-        assert booking.status == BookingStatus.PENDING.value
+        assert booking.status == PENDING
         assert booking.created_at is not None
 
-    def test_booking_status_transition(self, db_session: Session):
+    def test_booking_status_transition(self, db_session: Session, make_event):
         """Test transitioning booking status from PENDING to FINALIZED."""
-        event = Event(title="Seminar", capacity=30, booked_count=0)
-        db_session.add(event)
-        db_session.commit()
+        event = make_event(title="Seminar", capacity=30)
 
         booking = Booking(
             event_id=event.id,
             user_id=99,
-            status=BookingStatus.PENDING.value
+            status=PENDING
         )
         db_session.add(booking)
         db_session.commit()
 
         # Change status to FINALIZED
-        booking.status = BookingStatus.FINALIZED.value
+        booking.status = FINALIZED
         db_session.commit()
         db_session.refresh(booking)
 
-        assert booking.status == BookingStatus.FINALIZED.value
+        assert booking.status == FINALIZED
 
-    def test_booking_relationship_with_event(self, db_session: Session):
+    def test_booking_relationship_with_event(self, db_session: Session, make_event):
         """Test the relationship from Booking to Event."""
-        event = Event(title="Conference", capacity=500, booked_count=0)
-        db_session.add(event)
-        db_session.commit()
+        event = make_event(title="Conference", capacity=500)
 
         booking = Booking(
             event_id=event.id,
             user_id=10,
-            status=BookingStatus.PENDING.value
+            status=PENDING
         )
         db_session.add(booking)
         db_session.commit()
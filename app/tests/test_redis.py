@@ -5,6 +5,90 @@ import pytest
 import fakeredis
 
 
+def _lock_basic(fake_redis):
+    """Lock acquisition and release."""
+    lock = fake_redis.lock("test_lock", timeout=10)
+    
+    # Acquire lock
+    acquired = lock.acquire(blocking=False)
+    assert acquired is True
+    
+    # Release lock
+    lock.release()
+
+
+def _lock_blocking(fake_redis):
+    """A lock cannot be acquired twice."""
+    lock1 = fake_redis.lock("resource_lock", timeout=10)
+    lock2 = fake_redis.lock("resource_lock", timeout=10)
+    
+    # First lock acquires successfully
+    assert lock1.acquire(blocking=False) is True
+    
+    # Second lock should fail to acquire (non-blocking)
+    assert lock2.acquire(blocking=False) is False
+    
+    # Release first lock
+    lock1.release()
+    
+    # Now second lock can acquire
+    assert lock2.acquire(blocking=False) is True
+    lock2.release()
+
+
+def _lock_context_manager(fake_redis):
+    """Lock used as a context manager."""
+    lock = fake_redis.lock("ctx_lock", timeout=5)
+    
+    with lock:
+        # Inside context, lock is held
+        another_lock = fake_redis.lock("ctx_lock", timeout=5)
+        assert another_lock.acquire(blocking=False) is False
+    
+    # Outside context, lock is released
+    assert another_lock.acquire(blocking=False) is True
+    another_lock.release()
+
+
+def _lock_timeout(fake_redis):
+    """Lock with a timeout is held until released."""
+    lock = fake_redis.lock("timeout_lock", timeout=1)
+    
+    # Acquire the lock
+    acquired = lock.acquire(blocking=False)
+    assert acquired is True
+    
+    # Lock should be held
+    another_lock = fake_redis.lock("timeout_lock", timeout=1)
+    assert another_lock.acquire(blocking=False) is False
+    
+    # Clean up
+    lock.release()
+
+
+def _lock_multiple(fake_redis):
+    """Different locks can be held simultaneously."""
+    lock1 = fake_redis.lock("lock_1", timeout=10)
+    lock2 = fake_redis.lock("lock_2", timeout=10)
+    
+    # Both locks can be acquired
+    assert lock1.acquire(blocking=False) is True
+    assert lock2.acquire(blocking=False) is True
+    
+    # Release both
+    lock1.release()
+    lock2.release()
+
+
+LOCK_SCENARIOS = {
+    "basic": _lock_basic,
+    "blocking": _lock_blocking,
+    "context_manager": _lock_context_manager,
+    "timeout": _lock_timeout,
+    "multiple": _lock_multiple,
+}
+
+
 class TestRedisIntegration:
     """Test Redis functionality."""
 
@@ -17,75 +101,10 @@ class TestRedisIntegration:
         value = fake_redis.get("test_key")
         assert value == "test_value"
 
-    def test_redis_lock_basic(self, fake_redis):
-        """Test Redis lock acquisition and release."""
-        lock = fake_redis.lock("test_lock", timeout=10)
-        
-        # Acquire lock
-        acquired = lock.acquire(blocking=False)
-        assert acquired is True
-        
-        # Release lock
-        lock.release()
-
-    def test_redis_lock_blocking(self, fake_redis):
-        """Test that a lock cannot be acquired twice."""
-        lock1 = fake_redis.lock("resource_lock", timeout=10)
-        lock2 = fake_redis.lock("resource_lock", timeout=10)
-        
-        # First lock acquires successfully
-        assert lock1.acquire(blocking=False) is True
-        
-        # Second lock should fail to acquire (non-blocking)
-        assert lock2.acquire(blocking=False) is False
-        
-        # Release first lock
-        lock1.release()
-        
-        # Now second lock can acquire
-        assert lock2.acquire(blocking=False) is True
-        lock2.release()
-
-    def test_redis_lock_context_manager(self, fake_redis):
-        """Test Redis lock using context manager."""
-        lock = fake_redis.lock("ctx_lock", timeout=5)
-        
-        with lock:
-            # Inside context, lock is held
-            another_lock = fake_redis.lock("ctx_lock", timeout=5)
-            assert another_lock.acquire(blocking=False) is False
-        
-        # Outside context, lock is released
-        assert another_lock.acquire(blocking=False) is True
-        another_lock.release()
-
-    def test_redis_lock_timeout(self, fake_redis):
-        """Test Redis lock with timeout."""
-        lock = fake_redis.lock("timeout_lock", timeout=1)
-        
-        # Acquire the lock
-        acquired = lock.acquire(blocking=False)
-        assert acquired is True
-        
-        # Lock should be held
-        another_lock = fake_redis.lock("timeout_lock", timeout=1)
-        assert another_lock.acquire(blocking=False) is False
-        
-        # Clean up
-        lock.release()
-
-    def test_redis_multiple_locks(self, fake_redis):
-        """Test multiple different locks can be held simultaneously."""
-        lock1 = fake_redis.lock("lock_1", timeout=10)
-        lock2 = fake_redis.lock("lock_2", timeout=10)
-        
-        # Both locks can be acquired
-        assert lock1.acquire(blocking=False) is True
-        assert lock2.acquire(blocking=False) is True
-        
-        # Release both
-        lock1.release()
-        lock2.release()
+    @pytest.mark.parametrize("scenario", list(LOCK_SCENARIOS))
+    def test_redis_lock(self, fake_redis, scenario):
+        """Test Redis lock behaviour (one case per scenario)."""
+        LOCK_SCENARIOS[scenario](fake_redis)
 
     def test_redis_data_persistence(self, fake_redis):
         """Test that Redis persists data during session."""
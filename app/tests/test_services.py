@@ -2,7 +2,8 @@
 Test booking service functions.
 """
 import pytest
-from concurrent.futures import ThreadPoolExecutor
+import redis
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 
 from app.models.books import Booking, BookingStatus
@@ -14,126 +15,203 @@ from app.services.bookings import (
     get_event_stats,
     get_overall_report,
 )
+from app.services.cache import REPORT_CACHE_KEY, event_stats_key
+from app.tests.conftest import TestingSessionLocal, finalized_count
+
+PENDING = BookingStatus.PENDING.value
+FINALIZED = BookingStatus.FINALIZED.value
 
 
 class TestBookingService:
     """Test booking service functions."""
 
-    def test_create_booking_success(self, db_session: Session, redis_client):
+    def test_create_booking_success(self, db_session: Session, make_event, redis_client):
         """Test creating a booking successfully."""
-        event = Event(title="Available Event", capacity=10, booked_count=0)
-        db_session.add(event)
-        db_session.commit()
-        db_session.refresh(event)
+        event = make_event(title="Available Event", capacity=10)
 
         booking = create_booking(db_session, event_id=event.id, user_id=1)
 
         assert booking.id is not None
         assert booking.event_id == event.id
         assert booking.user_id == 1
-        assert booking.status == BookingStatus.PENDING.value
+        assert booking.status == PENDING
 
         # Verify booked_count was incremented
-        db_session.refresh(event)
-        assert event.booked_count == 1
+        assert db_session.scalar(select(Event.booked_count).where(Event.id == event.id)) == 1
 
-    def test_create_booking_sold_out(self, db_session: Session, redis_client):
+    def test_create_booking_sold_out(self, db_session: Session, make_event, redis_client):
         """Test booking when event is sold out."""
-        event = Event(title="Sold Out Event", capacity=1, booked_count=1)
-        db_session.add(event)
-        db_session.commit()
+        event = make_event(title="Sold Out Event", capacity=1, booked_count=1)
 
         with pytest.raises(SoldOutError, match="Event is sold out"):
             create_booking(db_session, event_id=event.id, user_id=2)
 
-    def test_create_booking_last_ticket(self, db_session: Session, redis_client):
+    def test_create_booking_last_ticket(self, db_session: Session, make_event, redis_client):
         """Test booking the last available ticket."""
-        event = Event(title="Almost Full Event", capacity=5, booked_count=4)
-        db_session.add(event)
-        db_session.commit()
-        db_session.refresh(event)
+        event = make_event(title="Almost Full Event", capacity=5, booked_count=4)
 
         booking = create_booking(db_session, event_id=event.id, user_id=10)
 
         assert booking is not None
-        db_session.refresh(event)
-        assert event.booked_count == 5
+        assert db_session.scalar(select(Event.booked_count).where(Event.id == event.id)) == 5
 
         # Next booking should fail
         with pytest.raises(SoldOutError):
             create_booking(db_session, event_id=event.id, user_id=11)
 
-    def test_create_booking_race_condition_prevention(self, db_session: Session, redis_client):
-        """Test that Redis lock prevents race conditions."""
-        event = Event(title="Race Event", capacity=1, booked_count=0)
-        db_session.add(event)
+    def test_create_booking_is_idempotent_per_user(self, db_session: Session, make_event, redis_client):
+        """Test that a retried booking returns the original and keeps the seat count."""
+        event = make_event(title="Retry Event", capacity=5)
+        event_id = event.id
+
+        first = create_booking(db_session, event_id=event_id, user_id=1)
+        second = create_booking(db_session, event_id=event_id, user_id=1)
         db_session.commit()
+
+        assert second.id == first.id
+        assert db_session.scalar(select(Event.booked_count).where(Event.id == event_id)) == 1
+
+    def test_create_booking_retry_on_full_event(self, db_session: Session, make_event, redis_client):
+        """Test that the holder of the last seat can retry after the event sells out."""
+        event = make_event(title="Last Seat Retry", capacity=1)
+        event_id = event.id
+
+        first = create_booking(db_session, event_id=event_id, user_id=1)
+        second = create_booking(db_session, event_id=event_id, user_id=1)
+
+        assert second.id == first.id
+        assert db_session.scalar(select(Event.booked_count).where(Event.id == event_id)) == 1
+
+        # Other users are still turned away
+        with pytest.raises(SoldOutError):
+            create_booking(db_session, event_id=event_id, user_id=2)
+
+    def test_create_booking_sold_out_leaves_no_booking(
+        self, db_session: Session, make_event, redis_client
+    ):
+        """Test that a sold-out attempt inside an open transaction inserts nothing."""
+        event = make_event(title="Full In Transaction", capacity=1, booked_count=1)
+
+        db_session.execute(select(1))  # begin a transaction owned by the caller
+        with pytest.raises(SoldOutError):
+            create_booking(db_session, event_id=event.id, user_id=2)
+        db_session.commit()
+
+        count = db_session.scalar(
+            select(func.count()).select_from(Booking).where(Booking.event_id == event.id)
+        )
+        assert count == 0
+
+    def test_create_booking_rolled_back_with_caller_transaction(
+        self, db_session: Session, make_event, redis_client
+    ):
+        """Test that a booking made in the caller's transaction is undone by its rollback."""
+        event = make_event(title="Caller Rollback", capacity=5)
+
+        db_session.execute(select(1))  # begin a transaction owned by the caller
+        create_booking(db_session, event_id=event.id, user_id=1)
+        db_session.rollback()
+
+        count = db_session.scalar(
+            select(func.count()).select_from(Booking).where(Booking.event_id == event.id)
+        )
+        assert count == 0
+        assert db_session.scalar(select(Event.booked_count).where(Event.id == event.id)) == 0
+
+    def test_create_booking_unknown_event(self, db_session: Session, redis_client):
+        """Test that booking a nonexistent event is refused without a booking row."""
+        with pytest.raises(SoldOutError):
+            create_booking(db_session, event_id=99999, user_id=1)
+
+        assert db_session.scalar(select(func.count()).select_from(Booking)) == 0
+
+    def test_create_booking_race_condition_prevention(
+        self, db_session: Session, make_event, redis_client, thread_pool
+    ):
+        """Test that the atomic capacity update prevents overselling."""
+        event = make_event(title="Race Event", capacity=1)
         event_id = event.id
 
         results = []
         errors = []
 
         def attempt_booking(user_id: int):
+            # Each concurrent request gets its own session, as in the API
+            db = TestingSessionLocal()
             try:
-                booking = create_booking(db_session, event_id=event_id, user_id=user_id)
+                booking = create_booking(db, event_id=event_id, user_id=user_id)
                 results.append(booking)
             except SoldOutError as e:
                 errors.append(str(e))
             except Exception as e:
                 errors.append(f"Unexpected error: {e}")
+            finally:
+                db.close()
 
         # Simulate concurrent requests
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [executor.submit(attempt_booking, i) for i in range(1, 6)]
-            for f in futures:
-                f.result()
+        futures = [thread_pool.submit(attempt_booking, i) for i in range(1, 6)]
+        for f in futures:
+            f.result()
 
         # Only 1 booking should succeed
         assert len(results) == 1
         assert len(errors) == 4
 
         # Verify event state
-        db_session.refresh(event)
-        assert event.booked_count == 1
+        assert db_session.scalar(select(Event.booked_count).where(Event.id == event_id)) == 1
 
-    def test_finalize_booking(self, db_session: Session):
+    def test_finalize_booking(self, db_session: Session, make_event):
         """Test finalizing a booking."""
-        event = Event(title="Event to Finalize", capacity=10, booked_count=1)
-        db_session.add(event)
-        db_session.commit()
+        event = make_event(title="Event to Finalize", capacity=10, booked_count=1)
 
         booking = Booking(
             event_id=event.id,
             user_id=5,
-            status=BookingStatus.PENDING.value
+            status=PENDING
         )
         db_session.add(booking)
         db_session.commit()
-        db_session.refresh(booking)
 
         # Finalize the booking
         finalize_booking(db_session, booking.id)
 
-        db_session.refresh(booking)
-        assert booking.status == BookingStatus.FINALIZED.value
+        status = db_session.scalar(select(Booking.status).where(Booking.id == booking.id))
+        assert status == FINALIZED
+
+    def test_finalize_booking_twice_is_noop(self, db_session: Session, make_event):
+        """Test that finalizing an already finalized booking changes nothing."""
+        event = make_event(title="Finalize Twice", capacity=10, booked_count=1)
+
+        booking = Booking(event_id=event.id, user_id=6, status=FINALIZED)
+        db_session.add(booking)
+        db_session.commit()
+
+        finalize_booking(db_session, booking.id)
+
+        status = db_session.scalar(select(Booking.status).where(Booking.id == booking.id))
+        assert status == FINALIZED
 
     def test_finalize_nonexistent_booking(self, db_session: Session):
         """Test finalizing a booking that doesn't exist."""
         # Should not raise an error
         finalize_booking(db_session, 99999)
 
-    def test_get_event_stats(self, db_session: Session):
+    def test_get_event_stats(self, db_session: Session, make_event):
         """Test getting event statistics."""
-        event = Event(title="Stats Event", capacity=20, booked_count=10)
-        db_session.add(event)
-        db_session.commit()
-        db_session.refresh(event)
-
-        # Create some bookings
-        for i in range(10):
-            status = BookingStatus.FINALIZED.value if i < 5 else BookingStatus.PENDING.value
-            booking = Booking(event_id=event.id, user_id=i + 1, status=status)
-            db_session.add(booking)
+        event = make_event(title="Stats Event", capacity=20, booked_count=10)
+
+        # Create some bookings (one multi-row INSERT)
+        db_session.execute(
+            insert(Booking),
+            [
+                {
+                    "event_id": event.id,
+                    "user_id": i + 1,
+                    "status": FINALIZED if i < 5 else PENDING,
+                }
+                for i in range(10)
+            ],
+        )
         db_session.commit()
 
         stats = get_event_stats(db_session, event.id)
@@ -141,7 +219,7 @@ class TestBookingService:
         assert stats["event_id"] == event.id
         assert stats["capacity"] == 20
         assert stats["booked_count"] == 10
-        assert stats["finalized_count"] == 5
+        assert stats["finalized_count"] == finalized_count(db_session, event.id) == 5
 
     def test_get_event_stats_nonexistent(self, db_session: Session):
         """Test getting stats for nonexistent event."""
@@ -158,16 +236,15 @@ class TestBookingService:
         db_session.add_all([event1, event2, event3])
         db_session.commit()
 
-        # Create bookings
-        for event in [event1, event2, event3]:
-            db_session.refresh(event)
-            for i in range(5):
-                booking = Booking(
-                    event_id=event.id,
-                    user_id=i + 100,
-                    status=BookingStatus.FINALIZED.value
-                )
-                db_session.add(booking)
+        # Create bookings (one multi-row INSERT)
+        db_session.execute(
+            insert(Booking),
+            [
+                {"event_id": event.id, "user_id": i + 100, "status": FINALIZED}
+                for event in [event1, event2, event3]
+                for i in range(5)
+            ],
+        )
         db_session.commit()
 
         report = get_overall_report(db_session)
@@ -184,11 +261,9 @@ class TestBookingService:
         assert report["total_reserved"] == 0 or report["total_reserved"] is None
         assert report["total_finalized"] == 0
 
-    def test_multiple_users_booking_same_event(self, db_session: Session, redis_client):
+    def test_multiple_users_booking_same_event(self, db_session: Session, make_event, redis_client):
         """Test multiple users booking tickets for the same event."""
-        event = Event(title="Popular Event", capacity=5, booked_count=0)
-        db_session.add(event)
-        db_session.commit()
+        event = make_event(title="Popular Event", capacity=5)
         event_id = event.id
 
         bookings = []
@@ -198,9 +273,83 @@ class TestBookingService:
 
         assert len(bookings) == 5
         
-        db_session.refresh(event)
-        assert event.booked_count == 5
+        assert db_session.scalar(select(Event.booked_count).where(Event.id == event_id)) == 5
 
         # 6th booking should fail
         with pytest.raises(SoldOutError):
             create_booking(db_session, event_id=event_id, user_id=6)
+
+    def test_get_event_stats_served_from_cache(self, db_session: Session, make_event, redis_client):
+        """Test that event stats are cached and busted by a new booking."""
+        event = make_event(title="Cached Event", capacity=5)
+        event_id = event.id
+
+        assert get_event_stats(db_session, event_id)["booked_count"] == 0
+        assert redis_client.get(event_stats_key(event_id)) is not None
+
+        # Bypass the service: the cached value is still returned
+        event.booked_count = 3
+        db_session.commit()
+        assert get_event_stats(db_session, event_id)["booked_count"] == 0
+
+        # Booking through the service invalidates on commit
+        create_booking(db_session, event_id=event_id, user_id=1)
+        db_session.commit()
+        assert redis_client.get(event_stats_key(event_id)) is None
+        assert redis_client.get(REPORT_CACHE_KEY) is None
+        assert get_event_stats(db_session, event_id)["booked_count"] == 4
+
+    def test_get_event_stats_accepts_keyword_event_id(
+        self, db_session: Session, make_event, redis_client
+    ):
+        """Test that cached services take keyword arguments and share the cache key."""
+        event = make_event(title="Keyword Event", capacity=5, booked_count=2)
+
+        stats = get_event_stats(db_session, event_id=event.id)
+
+        assert stats["booked_count"] == 2
+        assert redis_client.get(event_stats_key(event.id)) is not None
+        assert get_event_stats(db_session, event.id) == stats
+
+    def test_get_overall_report_invalidated_by_finalize(self, db_session: Session, make_event, redis_client):
+        """Test that finalizing a booking busts the cached report."""
+        event = make_event(title="Report Cache Event", capacity=5, booked_count=1)
+
+        booking = Booking(event_id=event.id, user_id=1, status=PENDING)
+        db_session.add(booking)
+        db_session.commit()
+
+        assert get_overall_report(db_session)["total_finalized"] == 0
+        assert redis_client.get(REPORT_CACHE_KEY) is not None
+
+        finalize_booking(db_session, booking.id)
+
+        assert redis_client.get(REPORT_CACHE_KEY) is None
+        assert get_overall_report(db_session)["total_finalized"] == 1
+
+    def test_redis_outage_falls_back_to_database(
+        self, db_session: Session, make_event, redis_client, monkeypatch
+    ):
+        """Test that reads and bookings keep working when every Redis call fails."""
+        event = make_event(title="Redis Down Event", capacity=5, booked_count=1)
+
+        def unavailable(*args, **kwargs):
+            raise redis.TimeoutError("Timeout reading from socket")
+
+        for command in ("get", "set", "delete"):
+            monkeypatch.setattr(redis_client, command, unavailable)
+
+        assert get_event_stats(db_session, event.id)["booked_count"] == 1
+        assert get_overall_report(db_session)["total_reserved"] == 1
+
+        # The after_commit invalidation fails too, but the booking still commits
+        db_session.commit()  # end the read transaction; create_booking commits itself
+        booking = create_booking(db_session, event_id=event.id, user_id=1)
+        assert db_session.scalar(select(Event.booked_count).where(Event.id == event.id)) == 2
+        check = TestingSessionLocal()
+        try:
+            assert check.get(Booking, booking.id) is not None
+        finally:
+            check.close()
+
+        assert get_event_stats(db_session, event.id)["booked_count"] == 2
@@ -1,6 +0,0 @@
-def main():
-    print("Hello from ticket-fast-api!")
-
-
-if __name__ == "__main__":
-    main()